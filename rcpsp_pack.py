@@ -1,182 +1,507 @@
 
 #!/usr/bin/env python3
 """
-RCPSP solver using linear search from upper bound down to lower bound.
-This approach tries each makespan value sequentially to find the optimal solution.
+RCPSP solver using binary search between lower bound and upper bound.
+Each probe tests whether a makespan value is feasible and halves the search range.
 No time limit per makespan test - only overall 900s limit.
 """
 from docplex.cp.model import *
 import os
 import csv
 import time
+import logging
+import logging.handlers
+import signal
+import numpy as np
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from pathlib import Path
 from google.cloud import storage
-import os
 
 # Thời gian tối đa cho mỗi instance
 TIME_PER_INSTANCE = 900
 
-def solve_rcpsp_with_makespan_bound(data_file, target_makespan, time_remaining):
+# Number of CSV rows buffered between flushes
+FLUSH_EVERY = 10
+
+log = logging.getLogger(__name__)
+
+# Number of instances solved in parallel (RCPSP_PROCESSES=1 for serial mode)
+NUM_PROCESSES = max(1, int(os.environ.get("RCPSP_PROCESSES", os.cpu_count() or 1)))
+
+# CP Optimizer workers per solve - cores are split across parallel instances
+WORKERS_PER_SOLVE = max(1, (os.cpu_count() or 1) // NUM_PROCESSES)
+
+# Fixed seed so repeated runs follow the same search
+RANDOM_SEED = 42
+
+# Outcomes of a single makespan probe
+FEASIBLE, INFEASIBLE, UNKNOWN = "feasible", "infeasible", "unknown"
+
+# GCS client shared by every upload in this process, see _client()
+_CLIENT = None
+
+# Parsed instances are cached here, relative to the data directory
+CACHE_DIR = ".cache"
+
+# Smaller files parse faster than an .npz loads, so they are not cached
+CACHE_MIN_BYTES = 1 << 20
+
+def _parse_instance(data_file):
+    """
+    Parse a .data file, tokenizing the numeric block with numpy
+    Returns (NB_TASKS, NB_RESOURCES, CAPACITIES, DURATIONS, DEMANDS, SUCCESSORS, LB, UB)
+    LB/UB are None when the header does not specify them
+    """
+    # One read per file; only the header line has a variable token count
+    header, _, body = Path(data_file).read_text().partition('\n')
+    first_line = header.split()
+    NB_TASKS, NB_RESOURCES = int(first_line[0]), int(first_line[1])
+
+    # Read bounds
+    LOWER_BOUND = UPPER_BOUND = None
+    if len(first_line) >= 4:
+        LOWER_BOUND = int(first_line[2])
+        UPPER_BOUND = int(first_line[3])
+    elif len(first_line) == 3:
+        LOWER_BOUND = UPPER_BOUND = int(first_line[2])
+
+    # Capacities followed by the task rows
+    values = np.fromstring(body, sep=' ', dtype=np.int32)
+    CAPACITIES = values[:NB_RESOURCES]
+    values = values[NB_RESOURCES:]
+
+    # Rows have variable length: duration, demands, successor count, successors
+    row_starts = np.empty(NB_TASKS, dtype=np.int64)
+    pos = 0
+    for t in range(NB_TASKS):
+        row_starts[t] = pos
+        pos += NB_RESOURCES + 2 + int(values[pos + NB_RESOURCES + 1])
+
+    # Extract data
+    DURATIONS = values[row_starts]
+    DEMANDS = values[row_starts[:, None] + np.arange(1, NB_RESOURCES + 1)]
+    SUCCESSORS = [values[start + NB_RESOURCES + 2:end]
+                  for start, end in zip(row_starts, np.append(row_starts[1:], pos))]
+
+    return (NB_TASKS, NB_RESOURCES, CAPACITIES, DURATIONS, DEMANDS, SUCCESSORS,
+            LOWER_BOUND, UPPER_BOUND)
+
+
+def _read_instance(data_file):
+    """
+    Read a .data file once, using the .npz cache in CACHE_DIR when it is fresh
+    The cache is keyed by the source file's mtime and size
+    Returns the same tuple as _parse_instance
+    """
+    data_file = Path(data_file)
+    stat = data_file.stat()
+    if stat.st_size < CACHE_MIN_BYTES:
+        return _parse_instance(data_file)
+
+    cache_path = data_file.parent / CACHE_DIR / f"{data_file.name}.npz"
+
+    # Cache hit
+    try:
+        with np.load(cache_path) as arr:
+            if int(arr['mtime']) == stat.st_mtime_ns and int(arr['size']) == stat.st_size:
+                lb, ub = int(arr['lb']), int(arr['ub'])
+                return (int(arr['nb_tasks']), int(arr['nb_resources']), arr['cap'], arr['dur'], arr['dem'],
+                        np.split(arr['succ'], np.cumsum(arr['succ_len'])[:-1]),
+                        lb if lb >= 0 else None, ub if ub >= 0 else None)
+    except (OSError, KeyError, ValueError):
+        pass
+
+    # Cache miss - parse and write atomically so parallel workers never see a torn file
+    instance = _parse_instance(data_file)
+    NB_TASKS, NB_RESOURCES, CAPACITIES, DURATIONS, DEMANDS, SUCCESSORS, LOWER_BOUND, UPPER_BOUND = instance
+    try:
+        os.makedirs(cache_path.parent, exist_ok=True)
+        tmp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, mtime=stat.st_mtime_ns, size=stat.st_size,
+                     nb_tasks=NB_TASKS, nb_resources=NB_RESOURCES,
+                     cap=CAPACITIES, dur=DURATIONS, dem=DEMANDS,
+                     succ=np.concatenate(SUCCESSORS),
+                     succ_len=np.array([len(succ) for succ in SUCCESSORS]),
+                     lb=-1 if LOWER_BOUND is None else LOWER_BOUND,
+                     ub=-1 if UPPER_BOUND is None else UPPER_BOUND)
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        log.warning("Could not write instance cache %s: %s", cache_path, e)
+
+    return instance
+
+
+def _precedence_edges(instance):
+    """
+    Flatten SUCCESSORS into an (E, 2) array of 0-based (task, successor) pairs
+    Successor ids <= 0 are padding and are dropped
+    """
+    NB_TASKS, _, _, _, _, SUCCESSORS, _, _ = instance
+
+    counts = np.fromiter((len(succ) for succ in SUCCESSORS), dtype=np.int64, count=NB_TASKS)
+    dst = np.concatenate(SUCCESSORS) if NB_TASKS else np.empty(0, dtype=np.int32)
+    src = np.repeat(np.arange(NB_TASKS), counts)
+    valid = dst > 0
+    return np.stack([src[valid], dst[valid] - 1], axis=1)
+
+
+def _trivial_lower_bound(instance):
+    """
+    Compute max(critical path length, resource energy bounds) without the solver
+    Critical path: longest path through the precedence DAG in topological order
+    Resource bound: ceil(sum(duration * demand) / capacity) for each resource
+    """
+    NB_TASKS, NB_RESOURCES, CAPACITIES, DURATIONS, DEMANDS, _, _, _ = instance
+
+    # Longest path via Kahn's topological sort - O(V + E)
+    edges = _precedence_edges(instance)
+    succ = [[] for _ in range(NB_TASKS)]
+    for a, b in edges.tolist():
+        succ[a].append(b)
+    in_degree = np.bincount(edges[:, 1], minlength=NB_TASKS).tolist()
+
+    durations = DURATIONS.tolist()
+    earliest_start = [0] * NB_TASKS
+    ready = [t for t in range(NB_TASKS) if in_degree[t] == 0]
+    while ready:
+        t = ready.pop()
+        end = earliest_start[t] + durations[t]
+        for s in succ[t]:
+            if end > earliest_start[s]:
+                earliest_start[s] = end
+            in_degree[s] -= 1
+            if in_degree[s] == 0:
+                ready.append(s)
+    critical_path = max((earliest_start[t] + durations[t] for t in range(NB_TASKS)), default=0)
+
+    # Energy bound per resource (resources with zero capacity are skipped)
+    energy = DURATIONS.astype(np.int64) @ DEMANDS.astype(np.int64)
+    resource_bound = max((-(-int(energy[r]) // int(CAPACITIES[r]))
+                          for r in range(NB_RESOURCES) if CAPACITIES[r] > 0), default=0)
+
+    return max(critical_path, resource_bound)
+
+
+def _build_model(instance):
+    """
+    Build the RCPSP model once for an instance
+    Returns (mdl, makespan) - the makespan bound is added per probe
+    """
+    NB_TASKS, _, CAPACITIES, DURATIONS, DEMANDS, _, _, _ = instance
+
+    # docplex needs Python ints, not numpy scalars
+    CAPACITIES = CAPACITIES.tolist()
+    DURATIONS = DURATIONS.tolist()
+    edges = _precedence_edges(instance)
+
+    # Create CP model
+    mdl = CpoModel()
+
+    # Create interval variables for tasks
+    tasks = [interval_var(name=f'T{i + 1}', size=DURATIONS[i]) for i in range(NB_TASKS)]
+
+    # Add precedence constraints, one per (task, successor) edge
+    for a, b in edges.tolist():
+        mdl.add(end_before_start(tasks[a], tasks[b]))
+
+    # Add resource capacity constraints - transpose once so each resource
+    # only visits the tasks that actually use it
+    for r, column in enumerate(DEMANDS.T):
+        users = np.flatnonzero(column > 0)
+        if users.size:
+            resource_usage = [pulse(tasks[t], d) for t, d in zip(users.tolist(), column[users].tolist())]
+            mdl.add(sum(resource_usage) <= CAPACITIES[r])
+
+    # Makespan is the start of a zero-length sink activity that follows every
+    # task without successors, instead of a wide max over all task ends
+    sink = interval_var(name='M', size=0)
+    out_degree = np.bincount(edges[:, 0], minlength=NB_TASKS)
+    for t in np.flatnonzero(out_degree == 0).tolist():
+        mdl.add(end_before_start(tasks[t], sink))
+    makespan = start_of(sink)
+
+    return mdl, makespan
+
+
+def solve_rcpsp_with_makespan_bound(mdl, makespan, target_makespan, time_remaining):
     """
     Solve RCPSP with fixed makespan upper bound constraint
-    Returns True if feasible, False if infeasible
+    mdl and makespan come from _build_model; the bound is removed again after solving
+    Returns (status, solution) where status is FEASIBLE, INFEASIBLE (proven)
+    or UNKNOWN (no solution and no proof, e.g. time limit); solution is None
+    unless status is FEASIBLE
     No individual time limit - runs until solution found or time_remaining expires
     """
     try:
-        # Read data file
-        with open(data_file, 'r') as file:
-            first_line = file.readline().split()
-            NB_TASKS, NB_RESOURCES = int(first_line[0]), int(first_line[1])
-
-            CAPACITIES = [int(v) for v in file.readline().split()]
-            TASKS = [[int(v) for v in file.readline().split()] for i in range(NB_TASKS)]
-
-        # Extract data
-        DURATIONS = [TASKS[t][0] for t in range(NB_TASKS)]
-        DEMANDS = [TASKS[t][1:NB_RESOURCES + 1] for t in range(NB_TASKS)]
-        SUCCESSORS = [TASKS[t][NB_RESOURCES + 2:] for t in range(NB_TASKS)]
-
-        # Create CP model
-        mdl = CpoModel()
-
-        # Create interval variables for tasks
-        tasks = [interval_var(name=f'T{i + 1}', size=DURATIONS[i]) for i in range(NB_TASKS)]
-
-        # Add precedence constraints
-        for t in range(NB_TASKS):
-            for s in SUCCESSORS[t]:
-                if s > 0:  # Valid successor
-                    mdl.add(end_before_start(tasks[t], tasks[s - 1]))
-
-        # Add resource capacity constraints
-        for r in range(NB_RESOURCES):
-            resource_usage = [pulse(tasks[t], DEMANDS[t][r]) for t in range(NB_TASKS) if DEMANDS[t][r] > 0]
-            if resource_usage:
-                mdl.add(sum(resource_usage) <= CAPACITIES[r])
-
-        # Create makespan and add FIXED bound constraint
-        makespan = max(end_of(t) for t in tasks)
-        mdl.add(makespan <= target_makespan)
-
-        # Solve with remaining time - removed Workers and FailLimit
-        time_to_use = max(1, time_remaining)
+        # Add FIXED bound constraint for this probe only
+        bound = makespan <= target_makespan
+        mdl.add(bound)
 
-        res = mdl.solve(
-            TimeLimit=time_to_use,
-            LogVerbosity="Quiet"
-        )
+        # Solve with remaining time - cores are shared with parallel instances
+        time_to_use = max(1, time_remaining)
 
-        return res is not None and res.is_solution()
+        try:
+            res = mdl.solve(
+                TimeLimit=time_to_use,
+                Workers=WORKERS_PER_SOLVE,
+                SearchType="Restart",
+                RandomSeed=RANDOM_SEED,
+                LogVerbosity="Quiet"
+            )
+        finally:
+            mdl.remove(bound)
+
+        if res is None:
+            return UNKNOWN, None
+        if res.is_solution():
+            return FEASIBLE, res.get_solution()
+        if res.get_solve_status() == "Infeasible":
+            return INFEASIBLE, None
+        return UNKNOWN, None
 
     except Exception as e:
-        print(f"Error solving with makespan {target_makespan}: {str(e)}")
-        return False
+        log.error("Error solving with makespan %d: %s", target_makespan, e)
+        return UNKNOWN, None
 
 
 def solve_rcpsp_linear_search(data_file):
     """
-    Solve RCPSP using linear search from upper bound down to lower bound
+    Solve RCPSP using binary search between lower bound and upper bound
     Only overall TIME_PER_INSTANCE time limit - no limit per makespan test
     """
     start_time = time.time()
+    name = Path(data_file).name
 
     try:
-        # Read bounds from data file
-        with open(data_file, 'r') as file:
-            first_line = file.readline().split()
-            NB_TASKS, NB_RESOURCES = int(first_line[0]), int(first_line[1])
-
-            # Read bounds
-            LOWER_BOUND = UPPER_BOUND = None
-            if len(first_line) >= 4:
-                LOWER_BOUND = int(first_line[2])
-                UPPER_BOUND = int(first_line[3])
-                print(f"Bounds from file: LB={LOWER_BOUND}, UB={UPPER_BOUND}")
-            elif len(first_line) == 3:
-                LOWER_BOUND = UPPER_BOUND = int(first_line[2])
-                print(f"Single bound from file: {LOWER_BOUND}")
-            else:
-                print("No bounds specified in file")
-                return (None, None, None, "infeasible", time.time() - start_time)
+        # Parse data file once; every probe reuses the decoded instance
+        instance = _read_instance(data_file)
+        LOWER_BOUND, UPPER_BOUND = instance[6], instance[7]
+
+        if LOWER_BOUND is None and UPPER_BOUND is None:
+            log.warning("%s: no bounds specified in file", name)
+            return (None, None, None, "infeasible", time.time() - start_time)
+        log.debug("%s: bounds from file: LB=%s, UB=%s", name, LOWER_BOUND, UPPER_BOUND)
 
         if LOWER_BOUND is None or UPPER_BOUND is None:
-            print("Invalid bounds")
+            log.warning("%s: invalid bounds", name)
             return (None, None, None, "infeasible", time.time() - start_time)
 
-        # Linear search from upper bound down to lower bound
-        print(f"Starting linear search from {UPPER_BOUND} down to {LOWER_BOUND}")
-        print(f"Total time limit: {TIME_PER_INSTANCE}s")
+        # Tighten the search range with bounds that need no solver call
+        search_lb = max(LOWER_BOUND, _trivial_lower_bound(instance))
+        if search_lb > LOWER_BOUND:
+            log.debug("%s: tightened lower bound: %d -> %d", name, LOWER_BOUND, search_lb)
+
+        # Build the model once; each probe only changes the makespan bound
+        mdl, makespan_expr = _build_model(instance)
+
+        # Binary search over [search_lb, UPPER_BOUND], starting at UPPER_BOUND
+        log.debug("%s: starting binary search over [%d, %d], total time limit %ds",
+                  name, search_lb, UPPER_BOUND, TIME_PER_INSTANCE)
 
         optimal_makespan = None
         attempts = 0
         timeout_occurred = False
+        inconclusive = False
+        lo, hi = search_lb, UPPER_BOUND
 
-        for makespan in range(UPPER_BOUND, LOWER_BOUND - 1, -1):
+        while lo <= hi:
             attempts += 1
             elapsed = time.time() - start_time
             time_remaining = TIME_PER_INSTANCE - elapsed
 
             # Check total time limit
             if time_remaining <= 0:
-                print(f"Total time limit exceeded after {attempts} attempts")
+                log.debug("%s: total time limit exceeded after %d attempts", name, attempts)
                 timeout_occurred = True
                 break
 
-            print(f"  Attempt {attempts}: Testing makespan = {makespan}")
-            print(f"    Elapsed: {elapsed:.1f}s, Remaining: {time_remaining:.1f}s")
+            # Probe UB first so the search always holds a feasible makespan
+            # before bisecting; afterwards test the midpoint
+            makespan = hi if optimal_makespan is None else (lo + hi) // 2
+            log.debug("%s: attempt %d: testing makespan = %d (range [%d, %d]), elapsed %.1fs, remaining %.1fs",
+                      name, attempts, makespan, lo, hi, elapsed, time_remaining)
 
             # Test if this makespan is feasible
             attempt_start = time.time()
-            is_feasible = solve_rcpsp_with_makespan_bound(data_file, makespan, time_remaining)
+            probe_status, solution = solve_rcpsp_with_makespan_bound(mdl, makespan_expr, makespan, time_remaining)
             attempt_time = time.time() - attempt_start
 
-            print(f"    Attempt took: {attempt_time:.1f}s")
+            log.debug("%s: attempt %d took %.1fs", name, attempts, attempt_time)
 
-            if is_feasible:
+            if probe_status == FEASIBLE:
                 optimal_makespan = makespan
-                print(f"  ✓ Makespan {makespan} is FEASIBLE")
+                log.debug("%s: makespan %d is FEASIBLE", name, makespan)
+
+                # Warm-start the next (tighter) probe from this solution
+                mdl.set_starting_point(solution)
 
-                # Continue searching for better (smaller) makespan
-                continue
+                # Keep searching the lower half for a smaller makespan
+                hi = makespan - 1
+            elif probe_status == INFEASIBLE:
+                log.debug("%s: makespan %d is INFEASIBLE", name, makespan)
+
+                # Optimal makespan (if any) lies in the upper half
+                lo = makespan + 1
             else:
-                print(f"  ✗ Makespan {makespan} is INFEASIBLE")
+                log.debug("%s: makespan %d is UNKNOWN", name, makespan)
 
-                # If current makespan is infeasible, then optimal_makespan
-                # (if found) is the best we can do
-                break
+                # No proof either way - give up on values <= makespan but keep
+                # searching the upper half, so no infeasibility is claimed
+                inconclusive = True
+                lo = makespan + 1
 
         solve_time = time.time() - start_time
 
         if optimal_makespan is not None:
             # Determine status based on timeout and optimality
-            if solve_time > TIME_PER_INSTANCE or timeout_occurred:
+            if solve_time > TIME_PER_INSTANCE or timeout_occurred or inconclusive:
                 # Nếu chạy quá thời gian cho phép thì status là feasible
                 status = "feasible"
-                print(f"✓ Found FEASIBLE solution (timeout): {optimal_makespan}")
-            elif optimal_makespan == LOWER_BOUND:
-                # Nếu tìm được lower bound và không timeout thì optimal
-                status = "optimal"
-                print(f"✓ Found OPTIMAL solution: {optimal_makespan} (matches lower bound)")
+                log.debug("%s: found FEASIBLE solution (timeout): %d", name, optimal_makespan)
             else:
-                # Nếu không timeout nhưng chưa đạt lower bound thì feasible
-                status = "feasible"
-                print(f"✓ Found FEASIBLE solution: {optimal_makespan}")
+                # Search converged on decisive probes: either the makespan equals
+                # the lower bound or makespan - 1 was proven infeasible
+                status = "optimal"
+                log.debug("%s: found OPTIMAL solution: %d", name, optimal_makespan)
 
-            print(f"Linear search completed: tested {attempts} values in {solve_time:.2f}s")
+            log.debug("%s: binary search completed: tested %d values in %.2fs", name, attempts, solve_time)
             return (LOWER_BOUND, UPPER_BOUND, optimal_makespan, status, solve_time)
+        elif timeout_occurred or inconclusive:
+            # Không tìm được lời giải nhưng cũng không chứng minh được vô nghiệm
+            log.debug("%s: no solution and no infeasibility proof in range [%d, %d]",
+                      name, search_lb, UPPER_BOUND)
+            return (LOWER_BOUND, UPPER_BOUND, None, UNKNOWN, solve_time)
         else:
-            print(f"✗ No feasible solution found in range [{LOWER_BOUND}, {UPPER_BOUND}]")
+            log.debug("%s: no feasible solution found in range [%d, %d]", name, search_lb, UPPER_BOUND)
             return (LOWER_BOUND, UPPER_BOUND, None, "infeasible", solve_time)
 
     except Exception as e:
         solve_time = time.time() - start_time
-        print(f"Error: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        log.exception("%s: error: %s", name, e)
         return (None, None, None, "infeasible", solve_time)
 
 
+def _sort_results(output_file):
+    """
+    Sort the result rows of output_file by file name, keeping the header first
+    The file is rewritten atomically and only when the order changes
+    Returns True if the file was rewritten
+    """
+    with open(output_file, newline='') as f:
+        header, *rows = list(csv.reader(f))
+    sorted_rows = sorted(rows, key=lambda row: row[0])
+    if sorted_rows == rows:
+        return False
+
+    tmp_path = f"{output_file}.tmp"
+    with open(tmp_path, 'w', newline='') as f:
+        csv_writer = csv.writer(f)
+        csv_writer.writerow(header)
+        csv_writer.writerows(sorted_rows)
+    os.replace(tmp_path, output_file)
+    return True
+
+
+def _init_worker(log_queue):
+    """
+    Route a worker process's log records to the parent through log_queue and
+    restore the default SIGTERM action inherited from main() through fork
+    """
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    root = logging.getLogger()
+    root.handlers[:] = [logging.handlers.QueueHandler(log_queue)]
+
+
+def _client():
+    """
+    Return the process-wide GCS client, creating it on first use
+    """
+    global _CLIENT
+    _CLIENT = _CLIENT or storage.Client()
+    return _CLIENT
+
+
+def _upload_checkpoint(bucket, blob, local_path, offset, generation):
+    """
+    Append the bytes of local_path written after offset to blob so completed
+    rows survive preemption. The new tail is uploaded as a temporary part and
+    composed onto blob only while blob is still at generation, so earlier rows
+    are not re-uploaded and a tail is never appended twice.
+    offset None means the bucket copy is in an unknown state (an earlier upload
+    failed, possibly after it reached the server); the whole file is uploaded
+    Returns the new (offset, generation), or (None, None) after a failure
+    """
+    try:
+        if not offset:
+            with open(local_path, 'rb') as f:
+                data = f.read()
+            blob.upload_from_string(data, content_type="text/csv")
+            return len(data), blob.generation
+
+        with open(local_path, 'rb') as f:
+            f.seek(offset)
+            tail = f.read()
+        if not tail:
+            return offset, generation
+
+        part = bucket.blob(f"{blob.name}.part-{offset}")
+        part.upload_from_string(tail, content_type="text/csv")
+        try:
+            blob.compose([blob, part], if_generation_match=generation)
+        finally:
+            try:
+                part.delete()
+            except Exception as e:
+                log.warning("Could not delete %s: %s", part.name, e)
+        return offset + len(tail), blob.generation
+    except Exception as e:
+        log.warning("Checkpoint upload of %s failed: %s", local_path, e)
+        return None, None
+
+
+def _submit_upload(upload_pool, previous, bucket, blob, local_path, final=False, reordered=False):
+    """
+    Queue a checkpoint upload on upload_pool after the upload in previous
+    previous is the future of the prior upload (holding its offset and
+    generation) or None
+    With final=True, do a full upload unless the bucket object has exactly the
+    size of the local file; reordered says the local file was rewritten since
+    the last checkpoint, which always needs a full upload
+    Returns the future of this upload
+    """
+    def run():
+        offset, generation = previous.result() if previous is not None else (0, None)
+        if not reordered:
+            offset, generation = _upload_checkpoint(bucket, blob, local_path, offset, generation)
+        if final:
+            try:
+                blob.reload()
+                complete = not reordered and blob.size == os.path.getsize(local_path)
+            except Exception:
+                complete = False
+            if not complete:
+                blob.upload_from_filename(local_path)
+                offset, generation = os.path.getsize(local_path), blob.generation
+            log.info("Uploaded %s to gs://%s/%s", local_path, bucket.name, blob.name)
+        return offset, generation
+
+    return upload_pool.submit(run)
+
+
+def _exit_on_sigterm(signum, frame):
+    """
+    Turn SIGTERM (e.g. preemption) into SystemExit so finally/with cleanup
+    flushes the results CSV and shuts the pool down
+    """
+    raise SystemExit(128 + signum)
+
+
 def main():
+    logging.basicConfig(level=os.environ.get("RCPSP_LOG", "INFO"), format="%(message)s")
+    signal.signal(signal.SIGTERM, _exit_on_sigterm)
+
     # Define directories
     data_dir = Path("data")
     result_dir = Path("result")
@@ -188,11 +513,9 @@ def main():
     # Find all .data files in the data directory
     all_data_files = list(data_dir.glob("*.data"))
     if not all_data_files:
-        print(f"Warning: No .data files found in {data_dir}")
-        print(f"Current directory: {os.getcwd()}")
-        print("Directory contents:")
-        for item in os.listdir():
-            print(f"  {item}")
+        log.warning("No .data files found in %s", data_dir)
+        log.warning("Current directory: %s", os.getcwd())
+        log.warning("Directory contents: %s", ", ".join(os.listdir()))
         return
 
     # Sort files to ensure consistent order
@@ -201,10 +524,26 @@ def main():
     # Process ALL files instead of a specific range
     data_files = all_data_files
 
-    print(f"Found {len(all_data_files)} total .data files")
-    print(f"Processing ALL {len(data_files)} files in the data directory")
-    print(f"Using {TIME_PER_INSTANCE} seconds time limit per instance")
-    print("Strategy: Linear search from upper bound down to lower bound")
+    log.info("Found %d total .data files", len(all_data_files))
+    log.info("Processing ALL %d files in the data directory", len(data_files))
+    log.info("Using %d seconds time limit per instance", TIME_PER_INSTANCE)
+    log.info("Solving %d instances in parallel, %d worker(s) each", NUM_PROCESSES, WORKERS_PER_SOLVE)
+    log.info("Strategy: Binary search between lower bound and upper bound")
+
+    # Uploads to GCS only run with RCPSP_UPLOAD=1, on a background thread
+    upload_enabled = os.environ.get("RCPSP_UPLOAD") == "1"
+    upload_future = None
+    if upload_enabled:
+        upload_pool = ThreadPoolExecutor(max_workers=1)
+
+        # Tên bucket mà bạn đã tạo
+        bucket_name = "rcpsp-with-bounds-results-bucket"
+        bucket = _client().bucket(bucket_name)
+
+        local_path = "result/pack_with_bound_900s.csv"
+        blob_name = f"results/{os.path.basename(local_path)}"  # ví dụ "results/pack_with_bound_900s.csv"
+
+        blob = bucket.blob(blob_name)
 
     # Process files
     with open(output_file, 'w', newline='') as csvfile:
@@ -212,59 +551,84 @@ def main():
         # Updated CSV header as requested
         csv_writer.writerow(["File name", "LB", "UB", "Makespan", "Status", "Solve time (second)"])
 
-        for i, data_file in enumerate(data_files, 1):
-            file_name = data_file.name
-            print(f"\n{'=' * 60}")
-            print(f"[{i}/{len(data_files)}] Processing {file_name}")
-            print(f"{'=' * 60}")
-
+        # Children log through a queue so only the parent writes to the handlers
+        ctx = mp.get_context("fork")
+        log_queue = ctx.Queue()
+        listener = logging.handlers.QueueListener(log_queue, *logging.getLogger().handlers)
+        listener.start()
+
+        try:
+            # docplex.cp.model (which already pulls in docplex.cp.solver.solver) and
+            # google.cloud.storage are imported at module level; also load the
+            # local solver agent docplex imports lazily on first solve, so forked
+            # workers inherit it instead of importing it per child
+            import docplex.cp.solver.solver_local  # noqa: F401
+
+            # Solve files in parallel; rows are written as they complete and the
+            # file is sorted once at the end
+            executor = ProcessPoolExecutor(max_workers=NUM_PROCESSES, mp_context=ctx,
+                                           initializer=_init_worker, initargs=(log_queue,))
             try:
-                lb, ub, makespan, status, solve_time = solve_rcpsp_linear_search(data_file)
-
-                # Format values for CSV
-                lb_str = str(lb) if lb is not None else "N/A"
-                ub_str = str(ub) if ub is not None else "N/A"
-                makespan_str = str(makespan) if makespan is not None else "N/A"
-
-                csv_writer.writerow([
-                    file_name,
-                    lb_str,
-                    ub_str,
-                    makespan_str,
-                    status,
-                    f"{solve_time:.2f}"
-                ])
-                csvfile.flush()
-
-                print(f"\nFINAL RESULT:")
-                print(f"  File: {file_name}")
-                print(f"  LB: {lb_str}")
-                print(f"  UB: {ub_str}")
-                print(f"  Makespan: {makespan_str}")
-                print(f"  Status: {status}")
-                print(f"  Time: {solve_time:.2f}s")
-
-            except Exception as e:
-                print(f"Error processing {file_name}: {str(e)}")
-                csv_writer.writerow([file_name, "N/A", "N/A", "N/A", "infeasible", "0.00"])
+                futures = {executor.submit(solve_rcpsp_linear_search, data_file): data_file
+                           for data_file in data_files}
+
+                for i, future in enumerate(as_completed(futures), 1):
+                    file_name = futures[future].name
+                    try:
+                        lb, ub, makespan, status, solve_time = future.result()
+
+                        # Format values for CSV
+                        lb_str = str(lb) if lb is not None else "N/A"
+                        ub_str = str(ub) if ub is not None else "N/A"
+                        makespan_str = str(makespan) if makespan is not None else "N/A"
+
+                        csv_writer.writerow([
+                            file_name,
+                            lb_str,
+                            ub_str,
+                            makespan_str,
+                            status,
+                            f"{solve_time:.2f}"
+                        ])
+
+                        log.info("[%d/%d] %s: LB=%s UB=%s Makespan=%s Status=%s Time=%.2fs",
+                                 i, len(data_files), file_name, lb_str, ub_str, makespan_str, status, solve_time)
+
+                    except Exception as e:
+                        log.error("[%d/%d] Error processing %s: %s", i, len(data_files), file_name, e)
+                        csv_writer.writerow([file_name, "N/A", "N/A", "N/A", "infeasible", "0.00"])
+
+                    # Flush rows in batches instead of after every row and
+                    # checkpoint the partial CSV to the bucket
+                    if i % FLUSH_EVERY == 0:
+                        csvfile.flush()
+                        if upload_enabled:
+                            upload_future = _submit_upload(upload_pool, upload_future, bucket, blob, local_path)
+            finally:
+                # Write out finished rows before waiting on running instances,
+                # and drop the queued ones if the loop was interrupted
                 csvfile.flush()
-
-    print(f"\n{'=' * 60}")
-    print(f"ALL PROCESSING COMPLETE")
-    print(f"Results saved to: {output_file}")
-    print(f"{'=' * 60}")
-
-    # Tên bucket mà bạn đã tạo
-    bucket_name = "rcpsp-with-bounds-results-bucket"
-    client = storage.Client()
-    bucket = client.bucket(bucket_name)
-
-    local_path = "result/pack_with_bound_900s.csv"
-    blob_name = f"results/{os.path.basename(local_path)}"  # ví dụ "results/pack_with_bound_900s.csv"
-
-    blob = bucket.blob(blob_name)
-    blob.upload_from_filename(local_path)
-    print(f"Uploaded {local_path} to gs://{bucket_name}/{blob_name}")
+                executor.shutdown(cancel_futures=True)
+        finally:
+            # Drain queued worker records even if the pool loop raised
+            listener.stop()
+
+    # Let queued checkpoints read the unsorted file before it is replaced
+    if upload_future is not None:
+        upload_future.result()
+
+    # Rows were written in completion order; sort them by file name once
+    reordered = _sort_results(output_file)
+
+    log.info("ALL PROCESSING COMPLETE")
+    log.info("Results saved to: %s", output_file)
+
+    # Upload the rest of the results and wait for the queue to drain
+    if upload_enabled:
+        upload_future = _submit_upload(upload_pool, upload_future, bucket, blob, local_path,
+                                       final=True, reordered=reordered)
+        upload_pool.shutdown(wait=True)
+        upload_future.result()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file